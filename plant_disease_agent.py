@@ -1,8 +1,25 @@
 import streamlit as st
-import google.generativeai as genai
-from PIL import Image
+from PIL import Image, ImageOps
+import hashlib
+import importlib.util
+import io
 import json
-from googletrans import Translator, LANGUAGES
+import logging
+import operator
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+# Streamlit re-executes this script on every rerun, so the handler is only attached the first time
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_log_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -12,59 +29,84 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Files shipped with the app are resolved from here, not from the working directory
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # --- Custom CSS for Styling ---
-st.markdown("""
-<style>
-    /* General Styles */
-    .stApp {
-        background-color: #f0f2f6;
-    }
-    /* Title */
-    h1 {
-        color: #00684A;
-    }
-    /* Sidebar */
-    [data-testid="stSidebar"] {
-        background-color: #ffffff;
-        border-right: 2px solid #e0e0e0;
-    }
-    /* Buttons */
-    .stButton>button {
-        background-color: #008CBA;
-        color: white;
-        border-radius: 20px;
-        border: none;
-        padding: 10px 20px;
-        transition: background-color 0.3s;
-    }
-    .stButton>button:hover {
-        background-color: #005f73;
-    }
-    /* Expander */
-    .st-expander {
-        border: 1px solid #00684A;
-        border-radius: 10px;
-    }
-    .st-expander header {
-        background-color: #E6F2ED;
-        color: #00684A;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def _css():
+    """Reads the app stylesheet from disk once instead of on every rerun."""
+    with open(os.path.join(_APP_DIR, "style.css"), encoding="utf-8") as f:
+        return f.read()
+
+st.markdown(f"<style>{_css()}</style>", unsafe_allow_html=True)
 
 # --- Gemini API and Translator Configuration ---
 
 # Initialize session state variables
 if 'gemini_response' not in st.session_state:
     st.session_state.gemini_response = None
+if 'vision_cache' not in st.session_state:
+    st.session_state.vision_cache = {}
+if 'translation_cache' not in st.session_state:
+    st.session_state.translation_cache = {}
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'chat_obj' not in st.session_state:
+    st.session_state.chat_obj = None
+if 'chat_context' not in st.session_state:
+    st.session_state.chat_context = []
 if 'selected_lang_code' not in st.session_state:
     st.session_state.selected_lang_code = 'en'
 if 'selected_lang_name' not in st.session_state:
     st.session_state.selected_lang_name = 'English'
 
+# --- Language Options ---
+
+# Language codes supported by googletrans, copied from googletrans.LANGUAGES so that
+# googletrans (and the httpx stack behind it) is only imported once a translation is needed
+LANGUAGES = {
+    'af': 'afrikaans', 'sq': 'albanian', 'am': 'amharic', 'ar': 'arabic', 'hy': 'armenian',
+    'az': 'azerbaijani', 'eu': 'basque', 'be': 'belarusian', 'bn': 'bengali', 'bs': 'bosnian',
+    'bg': 'bulgarian', 'ca': 'catalan', 'ceb': 'cebuano', 'ny': 'chichewa', 'zh-cn': 'chinese (simplified)',
+    'zh-tw': 'chinese (traditional)', 'co': 'corsican', 'hr': 'croatian', 'cs': 'czech', 'da': 'danish',
+    'nl': 'dutch', 'en': 'english', 'eo': 'esperanto', 'et': 'estonian', 'tl': 'filipino',
+    'fi': 'finnish', 'fr': 'french', 'fy': 'frisian', 'gl': 'galician', 'ka': 'georgian',
+    'de': 'german', 'el': 'greek', 'gu': 'gujarati', 'ht': 'haitian creole', 'ha': 'hausa',
+    'haw': 'hawaiian', 'iw': 'hebrew', 'he': 'hebrew', 'hi': 'hindi', 'hmn': 'hmong',
+    'hu': 'hungarian', 'is': 'icelandic', 'ig': 'igbo', 'id': 'indonesian', 'ga': 'irish',
+    'it': 'italian', 'ja': 'japanese', 'jw': 'javanese', 'kn': 'kannada', 'kk': 'kazakh',
+    'km': 'khmer', 'ko': 'korean', 'ku': 'kurdish (kurmanji)', 'ky': 'kyrgyz', 'lo': 'lao',
+    'la': 'latin', 'lv': 'latvian', 'lt': 'lithuanian', 'lb': 'luxembourgish', 'mk': 'macedonian',
+    'mg': 'malagasy', 'ms': 'malay', 'ml': 'malayalam', 'mt': 'maltese', 'mi': 'maori',
+    'mr': 'marathi', 'mn': 'mongolian', 'my': 'myanmar (burmese)', 'ne': 'nepali', 'no': 'norwegian',
+    'or': 'odia', 'ps': 'pashto', 'fa': 'persian', 'pl': 'polish', 'pt': 'portuguese',
+    'pa': 'punjabi', 'ro': 'romanian', 'ru': 'russian', 'sm': 'samoan', 'gd': 'scots gaelic',
+    'sr': 'serbian', 'st': 'sesotho', 'sn': 'shona', 'sd': 'sindhi', 'si': 'sinhala',
+    'sk': 'slovak', 'sl': 'slovenian', 'so': 'somali', 'es': 'spanish', 'su': 'sundanese',
+    'sw': 'swahili', 'sv': 'swedish', 'tg': 'tajik', 'ta': 'tamil', 'te': 'telugu',
+    'th': 'thai', 'tr': 'turkish', 'uk': 'ukrainian', 'ur': 'urdu', 'ug': 'uyghur',
+    'uz': 'uzbek', 'vi': 'vietnamese', 'cy': 'welsh', 'xh': 'xhosa', 'yi': 'yiddish',
+    'yo': 'yoruba', 'zu': 'zulu',
+}
+
+@st.cache_resource
+def _language_options():
+    """Builds the language selector options once per process instead of on every script rerun."""
+    # LANGUAGES maps code -> name; invert it into { 'English': 'en', 'French': 'fr', ... }.
+    # Codes sharing a name ('iw' and 'he' are both Hebrew) collapse into one entry, keeping the later code
+    lang_options = {name.capitalize(): code for code, name in LANGUAGES.items()}
+    # Sort the (name, code) pairs alphabetically by name so a selection carries its code with it
+    sorted_lang_pairs = sorted(lang_options.items(), key=operator.itemgetter(0))
+    # Find the index of 'English' in the sorted list to set it as the default
+    try:
+        default_index = sorted_lang_pairs.index(('English', 'en'))
+    except ValueError:
+        default_index = 0
+    return sorted_lang_pairs, default_index
+
+_SORTED_LANG_PAIRS, _DEFAULT_LANG_IDX = _language_options()
+
 
 # Sidebar for API Key, Navigation, and Language Selection
 with st.sidebar:
@@ -73,6 +115,7 @@ with st.sidebar:
     
     if api_key:
         try:
+            import google.generativeai as genai # Deferred so startup does not pay for the gRPC stack
             genai.configure(api_key=api_key)
             st.success("API Key configured successfully!")
         except Exception as e:
@@ -88,24 +131,16 @@ with st.sidebar:
 
     # --- Centralized Language Selector (Improved) ---
     st.header("Language Settings")
-    # Create a dictionary of { 'English': 'en', 'French': 'fr', ... }
-    lang_options = {name.capitalize(): code for name, code in LANGUAGES.items()}
-    # Get the list of capitalized language names and sort them alphabetically
-    sorted_lang_names = sorted(list(lang_options.keys()))
-    # Find the index of 'English' in the sorted list to set it as the default
-    try:
-        default_index = sorted_lang_names.index('English')
-    except ValueError:
-        default_index = 0
     # The selectbox now displays the sorted, full language names
-    selected_lang_name = st.selectbox(
+    selected_lang_name, selected_lang_code = st.selectbox(
         "Translate Output To:",
-        sorted_lang_names, # Use the sorted list of full names
-        index=default_index,
+        _SORTED_LANG_PAIRS, # Use the sorted (name, code) pairs, showing only the names
+        index=_DEFAULT_LANG_IDX,
+        format_func=operator.itemgetter(0),
         key="lang_selector"
     )
-    # Use the user's selection to find the corresponding code for the API
-    st.session_state.selected_lang_code = lang_options[selected_lang_name]
+    # The selected pair already holds the code for the API
+    st.session_state.selected_lang_code = selected_lang_code
     st.session_state.selected_lang_name = selected_lang_name
     
     st.markdown("---")
@@ -113,56 +148,410 @@ with st.sidebar:
 
 # --- Helper Functions ---
 
-def get_gemini_vision_response(image, prompt):
+@st.cache_resource
+def _get_model(api_key):
+    """Returns the shared Gemini model for the given API key, constructed once instead of on every rerun."""
+    import google.generativeai as genai
+    return genai.GenerativeModel('gemini-1.5-flash-latest')
+
+# Uploads within both limits are sent to Gemini unchanged
+VISION_MAX_SIDE = 1024
+VISION_MAX_BYTES = 1_500_000
+EXIF_ORIENTATION = 0x0112
+
+def _prepare_vision_payload(image_bytes):
+    """Downscales and re-encodes an image as JPEG so it costs fewer tokens to send to Gemini."""
+    buf = io.BytesIO()
+    # The decoded pixels only live inside this block and are released as soon as the JPEG is written
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        # Image.open only parses the header, so checking the size and EXIF orientation here decodes nothing.
+        # Only upright images pass through, so Gemini always receives the pixels the right way up.
+        if (
+            len(image_bytes) < VISION_MAX_BYTES
+            and max(image.size) <= VISION_MAX_SIDE
+            and image.format in ("JPEG", "PNG")
+            and image.getexif().get(EXIF_ORIENTATION, 1) == 1
+        ):
+            return {"mime_type": Image.MIME[image.format], "data": image_bytes}
+        # Lets the JPEG decoder scale down while decoding instead of materialising the full-size image
+        image.draft("RGB", (VISION_MAX_SIDE, VISION_MAX_SIDE))
+        # Re-encoding drops the EXIF tags, so apply the orientation to the pixels first (phone portraits)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE), Image.Resampling.LANCZOS)
+        image.save(buf, format="JPEG", quality=85)
+    return {"mime_type": "image/jpeg", "data": buf.getvalue()}
+
+# Constrains Gemini to emit exactly the analysis object as JSON, without code fences or prose
+VISION_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "plant_name": {"type": "string"},
+        "disease_name": {"type": "string"},
+        "causes_of_disease": {"type": "string"},
+        "symptoms_of_disease": {"type": "array", "items": {"type": "string"}},
+        "cure_of_disease": {"type": "string"},
+    },
+    "required": ["plant_name", "disease_name"],
+}
+
+@st.cache_data(show_spinner=False)
+def _analyze_image(image_hash, _image_bytes, prompt, _api_key):
+    """Calls Gemini Vision for an image; cached on the image hash and prompt, errors are not cached."""
+    response = _get_model(_api_key).generate_content(
+        [prompt, _prepare_vision_payload(_image_bytes)],
+        generation_config={"response_mime_type": "application/json", "response_schema": VISION_RESPONSE_SCHEMA},
+    )
+    return json.loads(response.text)
+
+def get_gemini_vision_response(image_bytes, prompt, api_key):
     """Sends an image and prompt to the Gemini Pro Vision model and returns the response."""
+    image_hash = hashlib.blake2b(image_bytes).hexdigest()
+    cache_key = (image_hash, prompt)
+    if cache_key in st.session_state.vision_cache:
+        return st.session_state.vision_cache[cache_key]
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content([prompt, image])
-        # A more robust way to find and parse JSON
-        json_text = response.text[response.text.find('{'):response.text.rfind('}')+1]
-        return json.loads(json_text)
+        response_data = _analyze_image(image_hash, image_bytes, prompt, api_key)
     except json.JSONDecodeError:
         st.error("Error: Could not decode the response from the AI. The AI may have returned a non-JSON response. Please try again with a clearer image.")
         return None
     except Exception as e:
         st.error(f"An error occurred while calling the Gemini API: {e}")
         return None
+    st.session_state.vision_cache[cache_key] = response_data
+    return response_data
 
-def translate_dictionary(data_dict, dest_lang):
-    """Translates the string values of a dictionary to the destination language."""
-    if not isinstance(data_dict, dict) or dest_lang == 'en':
-        return {key.replace('_', ' ').title(): value for key, value in data_dict.items()}
-    
-    translator = Translator()
+# Local CTranslate2 conversion of facebook/nllb-200-distilled-600M, quantized to int8 (see README)
+NLLB_MODEL_DIR = os.path.join(_APP_DIR, "nllb-200-distilled-600M-int8")
+NLLB_TOKENIZER = "facebook/nllb-200-distilled-600M"
+
+# googletrans language codes mapped to the FLORES-200 codes NLLB expects.
+# Languages missing here (e.g. Corsican, Hawaiian, Latin) are always sent to googletrans.
+_FLORES_CODES = {
+    'af': 'afr_Latn', 'sq': 'als_Latn', 'am': 'amh_Ethi', 'ar': 'arb_Arab', 'hy': 'hye_Armn',
+    'az': 'azj_Latn', 'eu': 'eus_Latn', 'be': 'bel_Cyrl', 'bn': 'ben_Beng', 'bs': 'bos_Latn',
+    'bg': 'bul_Cyrl', 'ca': 'cat_Latn', 'ceb': 'ceb_Latn', 'ny': 'nya_Latn', 'zh-cn': 'zho_Hans',
+    'zh-tw': 'zho_Hant', 'hr': 'hrv_Latn', 'cs': 'ces_Latn', 'da': 'dan_Latn', 'nl': 'nld_Latn',
+    'eo': 'epo_Latn', 'et': 'est_Latn', 'tl': 'tgl_Latn', 'fi': 'fin_Latn', 'fr': 'fra_Latn',
+    'gl': 'glg_Latn', 'ka': 'kat_Geor', 'de': 'deu_Latn', 'el': 'ell_Grek', 'gu': 'guj_Gujr',
+    'ht': 'hat_Latn', 'ha': 'hau_Latn', 'iw': 'heb_Hebr', 'he': 'heb_Hebr', 'hi': 'hin_Deva',
+    'hu': 'hun_Latn', 'is': 'isl_Latn', 'ig': 'ibo_Latn', 'id': 'ind_Latn', 'ga': 'gle_Latn',
+    'it': 'ita_Latn', 'ja': 'jpn_Jpan', 'jw': 'jav_Latn', 'kn': 'kan_Knda', 'kk': 'kaz_Cyrl',
+    'km': 'khm_Khmr', 'ko': 'kor_Hang', 'ku': 'kmr_Latn', 'ky': 'kir_Cyrl', 'lo': 'lao_Laoo',
+    'lv': 'lvs_Latn', 'lt': 'lit_Latn', 'lb': 'ltz_Latn', 'mk': 'mkd_Cyrl', 'mg': 'plt_Latn',
+    'ms': 'zsm_Latn', 'ml': 'mal_Mlym', 'mt': 'mlt_Latn', 'mi': 'mri_Latn', 'mr': 'mar_Deva',
+    'mn': 'khk_Cyrl', 'my': 'mya_Mymr', 'ne': 'npi_Deva', 'no': 'nob_Latn', 'or': 'ory_Orya',
+    'ps': 'pbt_Arab', 'fa': 'pes_Arab', 'pl': 'pol_Latn', 'pt': 'por_Latn', 'pa': 'pan_Guru',
+    'ro': 'ron_Latn', 'ru': 'rus_Cyrl', 'sm': 'smo_Latn', 'gd': 'gla_Latn', 'sr': 'srp_Cyrl',
+    'st': 'sot_Latn', 'sn': 'sna_Latn', 'sd': 'snd_Arab', 'si': 'sin_Sinh', 'sk': 'slk_Latn',
+    'sl': 'slv_Latn', 'so': 'som_Latn', 'es': 'spa_Latn', 'su': 'sun_Latn', 'sw': 'swh_Latn',
+    'sv': 'swe_Latn', 'tg': 'tgk_Cyrl', 'ta': 'tam_Taml', 'te': 'tel_Telu', 'th': 'tha_Thai',
+    'tr': 'tur_Latn', 'uk': 'ukr_Cyrl', 'ur': 'urd_Arab', 'ug': 'uig_Arab', 'uz': 'uzn_Latn',
+    'vi': 'vie_Latn', 'cy': 'cym_Latn', 'xh': 'xho_Latn', 'yi': 'ydd_Hebr', 'yo': 'yor_Latn',
+    'zu': 'zul_Latn',
+}
+
+# After a failed load the offline path is skipped for this long before loading is tried again
+OFFLINE_RETRY_SECONDS = 300
+
+@st.cache_resource(show_spinner=False)
+def _load_offline_translator():
+    """Loads the local NLLB model and tokenizer; only a successful load is cached."""
+    import ctranslate2
+    from transformers import AutoTokenizer
+    # The tokenizer may need a download, so it is fetched before paying for the model load
+    tokenizer = AutoTokenizer.from_pretrained(NLLB_TOKENIZER, src_lang="eng_Latn")
+    translator = ctranslate2.Translator(NLLB_MODEL_DIR)
+    return translator, tokenizer
+
+@st.cache_resource
+def _offline_load_state():
+    """Returns the process-wide record of the last failed offline load, kept across script reruns."""
+    return {"failed_at": None}
+
+def _get_offline_translator():
+    """Returns the local NLLB model and tokenizer, or None if they are not set up or fail to load."""
+    if not os.path.isdir(NLLB_MODEL_DIR) or importlib.util.find_spec("ctranslate2") is None:
+        return None
+    state = _offline_load_state()
+    if state["failed_at"] is not None and time.monotonic() - state["failed_at"] < OFFLINE_RETRY_SECONDS:
+        return None
     try:
-        translated_dict = {}
-        for key, value in data_dict.items():
-            translated_key = translator.translate(key.replace('_', ' ').title(), dest=dest_lang).text
-            # Handle both string and list of strings
-            if isinstance(value, list):
-                translated_value = [translator.translate(str(item), dest=dest_lang).text for item in value]
-            else:
-                translated_value = translator.translate(str(value), dest=dest_lang).text
-            translated_dict[translated_key] = translated_value
-        return translated_dict
+        offline = _load_offline_translator()
+    except Exception as e:
+        # Remembered rather than cached, so a transient failure is retried once the backoff expires
+        state["failed_at"] = time.monotonic()
+        logger.warning("Offline translation unavailable for %ss, using googletrans: %s", OFFLINE_RETRY_SECONDS, e)
+        return None
+    state["failed_at"] = None
+    return offline
+
+def _translate_offline(texts, dest_lang):
+    """Translates strings with the local NLLB model in one batch; returns None if it cannot be used."""
+    flores_code = _FLORES_CODES.get(dest_lang)
+    offline = _get_offline_translator() if flores_code else None
+    if offline is None:
+        return None
+    translator, tokenizer = offline
+    tokens = [tokenizer.convert_ids_to_tokens(tokenizer.encode(text)) for text in texts]
+    results = translator.translate_batch(tokens, target_prefix=[[flores_code]] * len(tokens))
+    # Each hypothesis starts with the target language token, which is not part of the translation
+    return [
+        tokenizer.decode(tokenizer.convert_tokens_to_ids(result.hypotheses[0][1:]), skip_special_tokens=True)
+        for result in results
+    ]
+
+# googletrans sends one HTTP request per string even when given a list, so they are issued concurrently
+TRANSLATION_WORKERS = 8
+
+@st.cache_resource
+def _translation_pool():
+    """Returns the process-wide worker pool for googletrans requests and the per-worker state it uses.
+
+    Both outlive script reruns, so each worker builds its Translator (and HTTP client) only once.
+    """
+    return ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix="translate"), threading.local()
+
+def _translate_online(text, dest_lang, thread_state):
+    """Translates one string with googletrans, using a Translator private to the calling worker thread."""
+    translator = getattr(thread_state, "translator", None)
+    if translator is None:
+        from googletrans import Translator # Deferred so startup does not pay for httpx
+        translator = thread_state.translator = Translator()
+    return translator.translate(text, dest=dest_lang).text
+
+# Translations are kept for a day; labels such as "Plant Name" are then free on every later render
+@st.cache_data(show_spinner=False, ttl=86400)
+def _translate_batch(texts, dest_lang):
+    """Translates a tuple of strings in one batch, offline if possible; cached per (texts, language)."""
+    try:
+        translations = _translate_offline(texts, dest_lang)
+    except Exception as e:
+        logger.warning("Offline translation failed, using googletrans: %s", e)
+        translations = None # Fall back to googletrans below
+    if translations is None:
+        executor, thread_state = _translation_pool()
+        translations = list(executor.map(lambda text: _translate_online(text, dest_lang, thread_state), texts))
+    return translations
+
+# Response fields whose values are shown translated; plant_name is usually a Latin
+# binomial and is shown as-is, and anything else the model adds is passed through
+_TRANSLATABLE_KEYS = {"disease_name", "causes_of_disease", "symptoms_of_disease", "cure_of_disease"}
+
+# Every static label the pages show, including the titles of the response keys
+DISPLAY_LABELS = [
+    "Plant Name", "Disease Name", "Symptoms Of Disease", "Causes Of Disease", "Cure Of Disease",
+    "Recommendations for", "Disease Identified", "Symptoms to Watch For", "Causes",
+    "Recommended Cure and Actions",
+]
+
+def _flatten_dictionary(data_dict):
+    """Lists the translatable values of a dictionary in order, expanding list values item by item."""
+    texts = []
+    for key, value in data_dict.items():
+        if key not in _TRANSLATABLE_KEYS:
+            continue
+        if isinstance(value, list):
+            texts.extend(str(item) for item in value)
+        else:
+            texts.append(str(value))
+    return texts
+
+def _inflate_dictionary(data_dict, texts, labels):
+    """Rebuilds a display dictionary from values produced by _flatten_dictionary and a label lookup."""
+    texts = iter(texts)
+    inflated = {}
+    for key, value in data_dict.items():
+        title = key.replace('_', ' ').title()
+        display_key = labels.get(title, title)
+        if key not in _TRANSLATABLE_KEYS:
+            inflated[display_key] = value
+        elif isinstance(value, list):
+            inflated[display_key] = [next(texts) for _ in value]
+        else:
+            inflated[display_key] = next(texts)
+    return inflated
+
+# Matches a letter in any script; strings of only digits, punctuation and symbols have nothing to translate
+_LETTER = re.compile(r'[^\W\d_]')
+
+def _needs_translation(text):
+    """Returns whether a string contains anything the translator could change."""
+    return bool(_LETTER.search(text))
+
+def _translate_texts(texts, dest_lang):
+    """Translates a list of strings in one batched request, raising if the translator fails."""
+    if dest_lang == 'en' or not texts:
+        return list(texts)
+    # Each distinct string that needs it is translated once; the rest pass through unchanged
+    pending = list(dict.fromkeys(text for text in texts if _needs_translation(text)))
+    if not pending:
+        return list(texts)
+    translated = dict(zip(pending, _translate_batch(tuple(pending), dest_lang)))
+    return [translated.get(text, text) for text in texts]
+
+def translate_texts(texts, dest_lang):
+    """Translates a list of strings to the destination language in one batched request."""
+    try:
+        return _translate_texts(texts, dest_lang)
     except Exception as e:
         st.error(f"Translation failed: {e}")
-        return {key.replace('_', ' ').title(): value for key, value in data_dict.items()} # Return original if fails
+        return list(texts) # Return original if fails
+
+def get_label_translations(dest_lang):
+    """Returns {English label: translated label} for DISPLAY_LABELS; the batch is cached per language."""
+    return dict(zip(DISPLAY_LABELS, translate_texts(DISPLAY_LABELS, dest_lang)))
+
+def translate_dictionary(data_dict, dest_lang):
+    """Translates the display keys and translatable values of a dictionary; raises if the translator fails."""
+    if not isinstance(data_dict, dict) or dest_lang == 'en':
+        return {key.replace('_', ' ').title(): value for key, value in data_dict.items()}
+    values = _translate_texts(_flatten_dictionary(data_dict), dest_lang)
+    labels = dict(zip(DISPLAY_LABELS, _translate_texts(DISPLAY_LABELS, dest_lang)))
+    return _inflate_dictionary(data_dict, values, labels)
+
+def get_translated_response(resp_dict, dest_lang):
+    """Returns the translated analysis, reusing a translation already made earlier in the session."""
+    # Responses are kept alive in vision_cache, so id() stays unique for the life of the session
+    cache_key = ("translated", id(resp_dict), dest_lang)
+    if cache_key not in st.session_state.translation_cache:
+        try:
+            st.session_state.translation_cache[cache_key] = translate_dictionary(resp_dict, dest_lang)
+        except Exception as e:
+            # Only successful translations are kept, so the next render tries again
+            st.error(f"Translation failed: {e}")
+            return translate_dictionary(resp_dict, 'en') # Return original if fails
+    return st.session_state.translation_cache[cache_key]
 
 def translate_single_text(text, dest_lang):
     """Translates a single string of text."""
-    if dest_lang == 'en' or not text:
+    if dest_lang == 'en' or not text or not _needs_translation(text):
         return text
     try:
-        translator = Translator()
-        return translator.translate(text, dest=dest_lang).text
+        return _translate_batch((text,), dest_lang)[0]
     except Exception as e:
         st.warning(f"Could not translate text: {e}")
         return text # Return original if translation fails
 
+# Splits after sentence-ending punctuation, keeping the whitespace so markdown layout survives
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])(\s+)')
+
+def translate_reply(text, dest_lang):
+    """Translates a chat reply sentence by sentence, sending all its sentences in one batch."""
+    # Parts alternate sentence, whitespace, sentence, ...
+    parts = _SENTENCE_BOUNDARY.split(text)
+    parts[::2] = translate_texts(parts[::2], dest_lang)
+    return "".join(parts)
+
+def stream_translated_reply(response, dest_lang, placeholder, start):
+    """Renders a streamed chat reply as it arrives, translating each sentence once it is complete.
+
+    Returns the seconds from `start` (a time.monotonic() reading taken before the request) to the first chunk.
+    """
+    time_to_first_token = None
+    rendered = ""
+    pending = ""
+    for chunk in response:
+        if time_to_first_token is None:
+            time_to_first_token = time.monotonic() - start
+        pending += chunk.text
+        # Parts alternate sentence, whitespace, sentence, ...; the last one may still be incomplete
+        *complete, pending = _SENTENCE_BOUNDARY.split(pending)
+        if complete and not pending:
+            # The whitespace run may continue in the next chunk; hold the last sentence back so the
+            # sentences match what translate_reply produces from the full text
+            pending = "".join(complete[-2:])
+            complete = complete[:-2]
+        for index, part in enumerate(complete):
+            rendered += part if index % 2 else translate_single_text(part, dest_lang)
+        placeholder.markdown(rendered + (pending if dest_lang == 'en' else "") + "▌")
+    rendered += translate_reply(pending, dest_lang)
+    placeholder.markdown(rendered)
+    return time_to_first_token
+
+# Gemini resends the whole chat history with every message, so long chats are compacted:
+# once the history passes CHAT_HISTORY_LIMIT messages, everything but the last
+# CHAT_RECENT_MESSAGES is replaced by a short summary exchange.
+CHAT_HISTORY_LIMIT = 10
+CHAT_RECENT_MESSAGES = 4
+
+def compact_chat(chat, model):
+    """Returns a chat session whose older turns are summarised, or the same session if it is still short."""
+    # ChatSession.history is a property (it folds in the last exchange first), so read it once
+    history = chat.history
+    if len(history) <= CHAT_HISTORY_LIMIT:
+        return chat
+    older, recent = history[:-CHAT_RECENT_MESSAGES], history[-CHAT_RECENT_MESSAGES:]
+    transcript = "\n".join(f"{message.role}: {message.parts[0].text}" for message in older)
+    try:
+        summary = model.generate_content(
+            "Summarize this gardening conversation in a few sentences, keeping every detail about "
+            "the user's plants and the advice already given:\n\n" + transcript
+        ).text
+    except Exception:
+        return chat # Keep the full history rather than interrupt the conversation
+    return model.start_chat(history=[
+        {"role": "user", "parts": [f"Summary of our conversation so far: {summary}"]},
+        {"role": "model", "parts": ["Understood. I will keep this in mind."]},
+        *recent,
+    ])
+
 
 # --- Main App Logic ---
 
+def render_analysis_result():
+    """Draws the translated analysis in the Prediction page's result column."""
+    st.subheader("Analysis Result")
+
+    lang_code = st.session_state.selected_lang_code
+    with st.spinner(f"Translating to {st.session_state.selected_lang_name}..."):
+        display_data = get_translated_response(st.session_state.gemini_response, lang_code)
+
+    if display_data:
+        for key, value in display_data.items():
+            st.markdown(f"**{key}:**")
+            # To handle list values gracefully
+            if isinstance(value, list):
+                for item in value:
+                    st.markdown(f"- {item}")
+            else:
+                st.markdown(f"> {value}")
+
+def _as_markdown(value):
+    """Formats a response value for st.markdown, turning lists into bullet points."""
+    if isinstance(value, list):
+        return "\n".join(f"- {item}" for item in value)
+    return value
+
+def render_recommendations():
+    """Draws the translated Cure & Recommendations page body."""
+    # Translate the data and labels before displaying; both are usually cached from earlier renders
+    lang_code = st.session_state.selected_lang_code
+    with st.spinner(f"Loading recommendations in {st.session_state.selected_lang_name}..."):
+        data = get_translated_response(st.session_state.gemini_response, lang_code)
+        labels = get_label_translations(lang_code)
+
+    # Use translated keys for display
+    plant_name_key = labels["Plant Name"]
+    disease_name_key = labels["Disease Name"]
+    symptoms_key = labels["Symptoms Of Disease"]
+    causes_key = labels["Causes Of Disease"]
+    cure_key = labels["Cure Of Disease"]
+
+    st.header(f"🌿 {labels['Recommendations for']} {data.get(plant_name_key, 'your plant')}")
+
+    with st.expander(labels["Disease Identified"], expanded=True):
+        st.markdown(f"**{disease_name_key}:** `{data.get(disease_name_key, 'N/A')}`")
+
+    with st.expander(labels["Symptoms to Watch For"], expanded=True):
+        st.markdown(_as_markdown(data.get(symptoms_key, 'No symptoms provided.')))
+
+    with st.expander(labels["Causes"], expanded=True):
+        st.markdown(_as_markdown(data.get(causes_key, 'No causes provided.')))
+
+    st.subheader(f"✅ {labels['Recommended Cure and Actions']}")
+    st.info(data.get(cure_key, 'No cure information available.'))
+
+
 # Page: Disease Prediction
 if app_mode == "Disease Prediction":
     st.title("Plant Disease Prediction System")
@@ -174,72 +563,32 @@ if app_mode == "Disease Prediction":
         col1, col2 = st.columns(2)
         
         with col1:
-            st.image(uploaded_file, caption="Uploaded Image", use_column_width=True)
-            image = Image.open(uploaded_file)
+            image_bytes = uploaded_file.getvalue()
+            st.image(image_bytes, caption="Uploaded Image", use_column_width=True)
 
         if st.button("Analyze Plant Health"):
             if not api_key:
                 st.warning("Please enter your Gemini API Key in the sidebar to proceed.")
             else:
                 with st.spinner("The AI is analyzing the image... Please wait."):
+                    # The response schema defines the JSON structure, so the prompt only describes the content
                     prompt = """
-                    Analyze the provided image of a plant. First, identify the plant species.
-                    Second, identify any visible diseases. Based on your analysis, provide a detailed report
-                    in a structured JSON format. The JSON object must contain the following keys exactly:
-                    'plant_name', 'disease_name', 'causes_of_disease', 'symptoms_of_disease', and 'cure_of_disease'.
-                    If the plant appears healthy, the value for 'disease_name' should be 'Healthy', and other fields
-                    can state that no actions are needed. Ensure the output is only the JSON object.
+                    Identify the plant species in this image and any visible diseases, with their causes,
+                    symptoms and cure. If the plant appears healthy, set 'disease_name' to 'Healthy' and
+                    state that no actions are needed.
                     """
-                    response_data = get_gemini_vision_response(image, prompt)
+                    response_data = get_gemini_vision_response(image_bytes, prompt, api_key)
                     st.session_state.gemini_response = response_data
 
         if st.session_state.gemini_response:
             with col2:
-                st.subheader("Analysis Result")
-                
-                with st.spinner(f"Translating to {st.session_state.selected_lang_name}..."):
-                    display_data = translate_dictionary(st.session_state.gemini_response, st.session_state.selected_lang_code)
-
-                if display_data:
-                    for key, value in display_data.items():
-                        st.markdown(f"**{key}:**")
-                        # To handle list values gracefully
-                        if isinstance(value, list):
-                            for item in value:
-                                st.markdown(f"- {item}")
-                        else:
-                            st.markdown(f"> {value}")
+                render_analysis_result()
 
 # Page: Cure & Recommendations
 elif app_mode == "Cure & Recommendations":
     st.title("Cure and Recommendations")
     if st.session_state.gemini_response:
-        
-        # Translate the data before displaying
-        with st.spinner(f"Loading recommendations in {st.session_state.selected_lang_name}..."):
-            data = translate_dictionary(st.session_state.gemini_response, st.session_state.selected_lang_code)
-
-        # Use translated keys for display
-        plant_name_key = translate_single_text("Plant Name", st.session_state.selected_lang_code)
-        disease_name_key = translate_single_text("Disease Name", st.session_state.selected_lang_code)
-        symptoms_key = translate_single_text("Symptoms Of Disease", st.session_state.selected_lang_code)
-        causes_key = translate_single_text("Causes Of Disease", st.session_state.selected_lang_code)
-        cure_key = translate_single_text("Cure Of Disease", st.session_state.selected_lang_code)
-
-        st.header(f"🌿 {translate_single_text('Recommendations for', st.session_state.selected_lang_code)} {data.get(plant_name_key, 'your plant')}")
-        
-        with st.expander(translate_single_text("Disease Identified", st.session_state.selected_lang_code), expanded=True):
-            st.markdown(f"**{disease_name_key}:** `{data.get(disease_name_key, 'N/A')}`")
-
-        with st.expander(translate_single_text("Symptoms to Watch For", st.session_state.selected_lang_code), expanded=True):
-            st.markdown(data.get(symptoms_key, 'No symptoms provided.'))
-
-        with st.expander(translate_single_text("Causes", st.session_state.selected_lang_code), expanded=True):
-            st.markdown(data.get(causes_key, 'No causes provided.'))
-
-        st.subheader(f"✅ {translate_single_text('Recommended Cure and Actions', st.session_state.selected_lang_code)}")
-        st.info(data.get(cure_key, 'No cure information available.'))
-        
+        render_recommendations()
     else:
         st.warning("Please analyze a plant image on the 'Disease Prediction' page first.")
         st.image("https://placehold.co/600x300/E6F2ED/00684A?text=No+Analysis+Data", use_column_width=True)
@@ -253,18 +602,27 @@ elif app_mode == "Gardening Q&A Chatbot":
     if not api_key:
         st.warning("Please enter your Gemini API Key in the sidebar to enable the chatbot.")
     else:
-        # Initialize the model and chat history
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        chat = model.start_chat(history=st.session_state.chat_history)
+        # Reuse the chat session across reruns; rebuild it only when the model or the history was reset.
+        # ChatSession.history raises after a broken stream, so it is not read here; starting an empty
+        # chat makes no request, so an empty transcript simply gets a fresh session.
+        model = _get_model(api_key)
+        chat = st.session_state.chat_obj
+        if chat is None or chat.model is not model or not st.session_state.chat_history:
+            # Rebuilt from the compacted history, not the full transcript, so long chats stay small
+            if not st.session_state.chat_history:
+                st.session_state.chat_context = []
+            chat = model.start_chat(history=st.session_state.chat_context)
+            st.session_state.chat_obj = chat
         
         # Display chat history (translating on the fly)
-        for message in chat.history:
+        lang_code = st.session_state.selected_lang_code
+        for message in st.session_state.chat_history:
             role = "human" if message.role == "user" else "ai"
             with st.chat_message(role):
                 text_to_display = message.parts[0].text
                 # Only translate AI messages for display
                 if role == 'ai':
-                    text_to_display = translate_single_text(text_to_display, st.session_state.selected_lang_code)
+                    text_to_display = translate_reply(text_to_display, lang_code)
                 st.markdown(text_to_display)
 
         # Get user input
@@ -276,12 +634,21 @@ elif app_mode == "Gardening Q&A Chatbot":
             
             # Send to Gemini and get response
             try:
-                response = chat.send_message(user_prompt)
                 with st.chat_message("ai"):
-                    with st.spinner(f"Translating response to {st.session_state.selected_lang_name}..."):
-                        translated_response = translate_single_text(response.text, st.session_state.selected_lang_code)
-                    st.markdown(translated_response)
-                # Update session state history (always store original English)
-                st.session_state.chat_history = chat.history
+                    start = time.monotonic()
+                    response = chat.send_message(user_prompt, stream=True)
+                    time_to_first_token = stream_translated_reply(
+                        response, st.session_state.selected_lang_code, st.empty(), start
+                    )
+                    if time_to_first_token is not None:
+                        logger.info("Chatbot time to first token: %.2fs", time_to_first_token)
+                # Update session state history (always store original English); the full transcript
+                # is kept for display while the chat session itself only carries a compacted history
+                st.session_state.chat_history = st.session_state.chat_history + chat.history[-2:]
+                st.session_state.chat_obj = compact_chat(chat, model)
+                st.session_state.chat_context = list(st.session_state.chat_obj.history)
             except Exception as e:
+                # A stream that broke off (blocked, empty or interrupted) leaves the session unusable,
+                # so the next rerun rebuilds it from the transcript, which only holds completed turns
+                st.session_state.chat_obj = None
                 st.error(f"Failed to get response from chatbot: {e}")
\ No newline at end of file